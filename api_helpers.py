@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+API Helpers
+
+Shared helpers for the API scripts in the repository root (create_test_data.py,
+download_examples.py, test_browser_download.py, test_case_history_download_links.py):
+JSON encoding, pooled sessions with optional host pinning, auth headers and access
+token caching.
+"""
+
+import base64
+import functools
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Use orjson for request/response bodies when available
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+    json_loads = json.loads
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Cached tokens are refreshed this many seconds before their `exp` claim
+TOKEN_REFRESH_MARGIN = 60
+
+def jget(response):
+    """Decode a JSON response body"""
+    return json_loads(response.content)
+
+@functools.lru_cache(maxsize=None)
+def resolve_host(host):
+    """Resolve a host name to an IPv4 address, once per process"""
+    return socket.gethostbyname(host)
+
+class PinnedHostAdapter(HTTPAdapter):
+    """Send requests to the host's address resolved on first use, keeping the original Host header
+
+    Mount it on a single origin so requests to other hosts or ports keep their own Host.
+    """
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        address = resolve_host(url.hostname)
+        request.headers["Host"] = url.netloc
+        request.url = urlunsplit(url._replace(netloc=f"{address}:{url.port}" if url.port else address))
+        return super().send(request, **kwargs)
+
+def make_session(pool_connections=10, pool_maxsize=20, max_retries=None, pin_origin=None):
+    """Create a pooled keep-alive session
+
+    By default idempotent requests are retried on connection errors and 429/502/503/504;
+    POST is only retried when the connection could not be made. With pin_origin
+    (e.g. "http://localhost:8000"), requests to that origin skip the per-request
+    name lookup through PinnedHostAdapter.
+    """
+    if max_retries is None:
+        max_retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+    adapter_args = {"pool_connections": pool_connections, "pool_maxsize": pool_maxsize, "max_retries": max_retries}
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(**adapter_args))
+    if pin_origin:
+        session.mount(f"{pin_origin}/", PinnedHostAdapter(**adapter_args))
+    return session
+
+@functools.lru_cache(maxsize=4)
+def auth_headers(token):
+    """Build the Authorization header dict once per token"""
+    return {"Authorization": f"Bearer {token}"}
+
+def jwt_exp(token):
+    """Read the `exp` claim from a JWT without verifying it; 0 if it cannot be read"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get("exp") or 0
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+def login(session, login_url, email, password, timeout=5):
+    """Log in with OAuth2 form data and return the token data, or None"""
+    response = session.post(
+        login_url,
+        data={"username": email, "password": password},
+        timeout=timeout
+    )
+    if response.status_code != 200:
+        logger.error("Login failed for %s: %s - %s", email, response.status_code, response.text)
+        return None
+    token_data = jget(response)
+    # Unwrap the standard {status_code, status, message, data} envelope
+    return token_data.get("data", token_data)
+
+class TokenCache:
+    """Token data keyed by login URL and email, optionally persisted to a JSON file
+
+    Entries are dropped once their access token is within TOKEN_REFRESH_MARGIN of
+    expiring, or explicitly through invalidate() when the server rejects them.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    @staticmethod
+    def key(login_url, email):
+        return f"{login_url}|{email}"
+
+    def _load(self):
+        """Load the cache file, ignoring a missing or corrupt one"""
+        if not self.path:
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        """Atomically write the cache file; call with the lock held"""
+        if not self.path:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write token cache %s: %s", self.path, e)
+
+    def get(self, key):
+        """Return cached token data that is not about to expire, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry.get("exp", 0) - time.time() > TOKEN_REFRESH_MARGIN:
+            return entry["token_data"]
+        return None
+
+    def put(self, key, token_data):
+        """Cache token data until its access token expires"""
+        exp = jwt_exp(token_data.get("access_token"))
+        if not exp:
+            return
+        with self._lock:
+            self._entries[key] = {"token_data": token_data, "exp": exp}
+            self._save()
+
+    def invalidate(self, key):
+        """Forget a token, e.g. after the server rejected it"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+def cached_login(session, login_url, email, password, cache):
+    """Return token data for the user from the cache, logging in only when there is no usable token"""
+    key = TokenCache.key(login_url, email)
+    token_data = cache.get(key)
+    if token_data:
+        logger.info("Using cached authentication token for %s", email)
+        return token_data
+    token_data = login(session, login_url, email, password)
+    if token_data:
+        cache.put(key, token_data)
+    return token_data
@@ -1,32 +1,29 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
+import atexit
 import uuid
 from datetime import datetime, timedelta
 import random
 import logging
 import warnings
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-# Suppress bcrypt warnings before any other imports
-warnings.filterwarnings("ignore", message=".*error reading bcrypt version.*")
-warnings.filterwarnings("ignore", message=".*trapped.*error reading bcrypt version.*")
+import bcrypt
 
-# Configure logging with a filter to suppress bcrypt warnings
-class BcryptWarningFilter(logging.Filter):
-    def filter(self, record):
-        return not ("error reading bcrypt version" in record.getMessage() or
-                   "trapped" in record.getMessage())
+# Suppress bcrypt version warnings before any other imports
+warnings.filterwarnings("ignore", category=UserWarning, module="passlib.handlers.bcrypt")
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Apply the filter to suppress bcrypt warnings
-logging.getLogger('passlib.handlers.bcrypt').addFilter(BcryptWarningFilter())
-logging.getLogger().addFilter(BcryptWarningFilter())
-
 # Add the parent directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
+from sqlalchemy import insert
+
 from app.db.database import get_db, engine, Base
 from app.models.user import User, UserRole
 from app.models.hospital import Hospital
@@ -44,10 +41,55 @@ from app.models.ai import AISession, AIMessage
 from app.models.document import FileDocument, DocumentType, UploadedBy
 from app.models.case_history import Document as CaseHistoryDocument
 from app.models.report import ReportDocument
-from app.api.auth import get_password_hash
 from app.config import settings
 from app.services.document_storage import document_storage
 
+# One low-cost salt shared by every seeded account. The resulting hashes are
+# still valid bcrypt hashes that verify at login, but this is only acceptable
+# for throwaway test fixtures - never for real user passwords.
+SALT = bcrypt.gensalt(rounds=4)
+
+# Seed passwords never change between runs, so their hashes are cached on disk
+# as a {password: hash} map and bcrypt is skipped entirely on later runs.
+_HASH_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.seed_hash_cache.json')
+
+def _load_hash_cache() -> dict:
+    """Load the persisted password hash cache, ignoring a missing or corrupt file"""
+    try:
+        with open(_HASH_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+_hash_cache = _load_hash_cache()
+_hash_cache_dirty = False
+
+def _save_hash_cache():
+    """Persist the password hash cache if any new hash was computed"""
+    if not _hash_cache_dirty:
+        return
+    try:
+        with open(_HASH_CACHE_FILE, 'w') as f:
+            json.dump(_hash_cache, f)
+    except OSError as e:
+        logger.warning(f"Could not write password hash cache {_HASH_CACHE_FILE}: {e}")
+
+atexit.register(_save_hash_cache)
+
+def hash_test_password(password: str) -> str:
+    """Hash a test fixture password with the shared module-level salt, reusing cached hashes"""
+    global _hash_cache_dirty
+    hashed = _hash_cache.get(password)
+    if hashed is None:
+        hashed = bcrypt.hashpw(password.encode(), SALT).decode()
+        _hash_cache[password] = hashed
+        _hash_cache_dirty = True
+    return hashed
+
+# Absolute profile photo directories, so seeding does not depend on the CWD
+_DOC_PHOTO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'doctor profile photos')
+_PATIENT_PHOTO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'patient profile photos')
+
 # Store credentials and entity information for output
 credentials = {
     "admin": [],
@@ -62,12 +104,16 @@ credentials = {
     "ai_messages": []
 }
 
-def upload_document_from_file(file_path: str, admin_user_id: str, db, document_type: DocumentType = DocumentType.OTHER, remark: str = None) -> tuple[str, str]:
-    """Upload a document from file system to in-memory storage and create database record"""
+def store_document_file(file_path: str) -> tuple[str, str, int, str]:
+    """Read a document from the file system into in-memory storage.
+
+    Touches no database session, so it is safe to run from worker threads.
+    Returns (storage_id, filename, size, download_link), or None on failure.
+    """
     try:
         if not os.path.exists(file_path):
             logger.warning(f"Document file not found: {file_path}")
-            return None, None
+            return None
 
         # Read file content
         with open(file_path, 'rb') as f:
@@ -95,6 +141,27 @@ def upload_document_from_file(file_path: str, admin_user_id: str, db, document_t
         # Create downloadable link using the public base URL from environment
         download_link = f"{public_base_url}{settings.API_V1_PREFIX}/documents/{storage_id}/download"
 
+        return storage_id, filename, file_size, download_link
+
+    except Exception as e:
+        logger.error(f"Failed to store document {file_path}: {e}")
+        return None
+
+def upload_document_from_file(file_path: str, admin_user_id: str, db, document_type: DocumentType = DocumentType.OTHER, remark: str = None, stored: tuple = None) -> tuple[str, str]:
+    """Upload a document from file system to in-memory storage and create database record
+
+    If `stored` is given it must be the result of store_document_file() for
+    this path (e.g. computed in a worker thread); only the database record is
+    created here.
+    """
+    try:
+        if stored is None:
+            stored = store_document_file(file_path)
+        if stored is None:
+            return None, None
+
+        storage_id, filename, file_size, download_link = stored
+
         # Create document record in database
         db_document = FileDocument(
             id=storage_id,
@@ -117,8 +184,9 @@ def upload_document_from_file(file_path: str, admin_user_id: str, db, document_t
         logger.error(f"Failed to upload document {file_path}: {e}")
         return None, None
 
-def create_profile_photo_record(photo_filename: str, admin_user_id: str, db) -> str:
+def create_profile_photo_record(photo_path: str, admin_user_id: str, db) -> str:
     """Create a database record for a profile photo using environment-based URL"""
+    photo_filename = os.path.basename(photo_path)
     try:
         # Create a predictable document ID based on filename
         import hashlib
@@ -143,29 +211,13 @@ def create_profile_photo_record(photo_filename: str, admin_user_id: str, db) ->
                 logger.info(f"Profile photo record already exists: {photo_filename} -> {download_link}")
             return download_link
 
-        # Try to find the photo file in possible locations
-        possible_paths = [
-            os.path.join('data', 'doctor profile photos', photo_filename),
-            os.path.join('data', 'patient profile photos', photo_filename),
-            os.path.join('..', 'data', 'doctor profile photos', photo_filename),
-            os.path.join('..', 'data', 'patient profile photos', photo_filename),
-            photo_filename  # Just the filename in current directory
-        ]
-
-        photo_path = None
-        file_size = 0
-
-        for path in possible_paths:
-            if os.path.exists(path):
-                photo_path = path
-                file_size = os.path.getsize(path)
-                break
-
-        if not photo_path:
-            logger.warning(f"Profile photo file not found: {photo_filename}")
+        if not os.path.exists(photo_path):
+            logger.warning(f"Profile photo file not found: {photo_path}")
             # Use a placeholder URL that works on any server
             return f"https://via.placeholder.com/150x150/cccccc/666666?text={photo_filename.split('.')[0]}"
 
+        file_size = os.path.getsize(photo_path)
+
         # Create document record in database
         db_document = FileDocument(
             id=storage_id,
@@ -188,6 +240,16 @@ def create_profile_photo_record(photo_filename: str, admin_user_id: str, db) ->
         logger.error(f"Failed to create profile photo record {photo_filename}: {e}")
         return f"https://via.placeholder.com/150x150/cccccc/666666?text={photo_filename.split('.')[0]}"
 
+def _bulk_insert(db, model, model_rows: list[dict]):
+    """Insert plain row dicts for `model` with a single Core executemany INSERT"""
+    # executemany needs the same keys in every row, so rows are batched per key
+    # set; absent columns keep their column defaults
+    batches = defaultdict(list)
+    for row in model_rows:
+        batches[tuple(sorted(row))].append(row)
+    for batch in batches.values():
+        db.execute(insert(model.__table__), batch)
+
 def clean_db():
     """Drop all tables and recreate them"""
     logger.info("Initializing database...")
@@ -200,6 +262,10 @@ def create_test_data():
     # Get database session
     db = next(get_db())
 
+    # Fixture rows are collected as plain dicts per model and written with
+    # Core bulk INSERTs, bypassing the ORM unit of work for this write-only path
+    rows = defaultdict(list)
+
     try:
         # Run migration to add health fields to patients table
         logger.info("Running migration to add health fields to patients table...")
@@ -253,17 +319,17 @@ def create_test_data():
         admin_name = "Admin User"
         admin_email = "admin@example.com"
         admin_password = "admin123"
-        admin_user = User(
+        admin_user = dict(
             id=admin_id,
             email=admin_email,
-            hashed_password=get_password_hash(admin_password),
+            hashed_password=hash_test_password(admin_password),
             name=admin_name,
             role=UserRole.ADMIN,
             contact="+1234567890",
             address="123 Admin St, Adminville",
             is_active=True
         )
-        db.add(admin_user)
+        rows[User].append(admin_user)
         credentials["admin"].append({
             "name": admin_name,
             "email": admin_email,
@@ -282,7 +348,7 @@ def create_test_data():
             hospital_contact = f"+1555{i}55{i}555"
 
             # Create hospital profile
-            hospital = Hospital(
+            hospital = dict(
                 id=hospital_id,
                 name=hospital_name,
                 address=hospital_address,
@@ -295,14 +361,14 @@ def create_test_data():
                 specialities=["Cardiology", "Neurology", "Pediatrics", "Orthopedics"],
                 website=f"https://hospital{i+1}.example.com"
             )
-            db.add(hospital)
+            rows[Hospital].append(hospital)
 
             # Create hospital user
             hospital_user_id = str(uuid.uuid4())
-            hospital_user = User(
+            hospital_user = dict(
                 id=hospital_user_id,
                 email=hospital_email,
-                hashed_password=get_password_hash(hospital_password),
+                hashed_password=hash_test_password(hospital_password),
                 name=hospital_name,
                 role=UserRole.HOSPITAL,
                 contact=hospital_contact,
@@ -310,7 +376,7 @@ def create_test_data():
                 profile_id=hospital_id,
                 is_active=True
             )
-            db.add(hospital_user)
+            rows[User].append(hospital_user)
 
             hospitals.append(hospital)
             credentials["hospitals"].append({
@@ -328,6 +394,10 @@ def create_test_data():
             'female': ['female1.png', 'female2.png', 'female3.png'],
             'male': ['male1.png', 'male2.png']
         }
+        PATIENT_PHOTO_PATHS = {
+            gender_key: [os.path.join(_PATIENT_PHOTO_DIR, fn) for fn in files]
+            for gender_key, files in patient_photo_files.items()
+        }
 
         # Create 5 doctors with Indian names and specific specialties
         doctors = []
@@ -343,6 +413,7 @@ def create_test_data():
             "Physiotherapist": "physiotharapist.png",
             "Lactation Expert": "lactation.png"
         }
+        DOCTOR_PHOTO_PATHS = {spec: os.path.join(_DOC_PHOTO_DIR, fn) for spec, fn in doctor_photo_files.items()}
 
         for i in range(5):
             doctor_id = str(uuid.uuid4())
@@ -357,11 +428,11 @@ def create_test_data():
             doctor_details = f"Experienced {doctor_specialty} with {doctor_experience} years of practice in maternal and child healthcare"
 
             # Create doctor profile photo record based on specialty
-            photo_file = doctor_photo_files[doctor_specialty]
-            doctor_photo_url = create_profile_photo_record(photo_file, admin_id, db)
+            photo_path = DOCTOR_PHOTO_PATHS[doctor_specialty]
+            doctor_photo_url = create_profile_photo_record(photo_path, admin_id, db)
 
             # Create doctor profile
-            doctor = Doctor(
+            doctor = dict(
                 id=doctor_id,
                 name=doctor_name,
                 photo=doctor_photo_url,  # Use the uploaded photo URL
@@ -370,21 +441,21 @@ def create_test_data():
                 details=doctor_details,
                 contact=doctor_contact
             )
-            db.add(doctor)
+            rows[Doctor].append(doctor)
 
             # Create doctor user
             doctor_user_id = str(uuid.uuid4())
-            doctor_user = User(
+            doctor_user = dict(
                 id=doctor_user_id,
                 email=doctor_email,
-                hashed_password=get_password_hash(doctor_password),
+                hashed_password=hash_test_password(doctor_password),
                 name=doctor_name,
                 role=UserRole.DOCTOR,
                 contact=doctor_contact,
                 profile_id=doctor_id,
                 is_active=True
             )
-            db.add(doctor_user)
+            rows[User].append(doctor_user)
 
             doctors.append(doctor)
             credentials["doctors"].append({
@@ -407,18 +478,18 @@ def create_test_data():
             hospital = hospitals[hospital_idx]
 
             mapping_id = str(uuid.uuid4())
-            hospital_doctor_mapping = HospitalDoctorMapping(
+            hospital_doctor_mapping = dict(
                 id=mapping_id,
-                hospital_id=hospital.id,
+                hospital_id=hospital["id"],
                 doctor_id=doctor_id
             )
-            db.add(hospital_doctor_mapping)
+            rows[HospitalDoctorMapping].append(hospital_doctor_mapping)
 
             # Store mapping information
             credentials["hospital_doctor_mappings"].append({
                 "id": mapping_id,
-                "hospital_id": hospital.id,
-                "hospital_name": hospital.name,
+                "hospital_id": hospital["id"],
+                "hospital_name": hospital["name"],
                 "doctor_id": doctor_id,
                 "doctor_name": doctor_name
             })
@@ -454,14 +525,14 @@ def create_test_data():
 
             # Upload profile photo based on gender
             if gender == Gender.FEMALE:
-                photo_file = patient_photo_files['female'][i % len(patient_photo_files['female'])]
+                photo_path = PATIENT_PHOTO_PATHS['female'][i % len(PATIENT_PHOTO_PATHS['female'])]
             else:
-                photo_file = patient_photo_files['male'][i % len(patient_photo_files['male'])]
+                photo_path = PATIENT_PHOTO_PATHS['male'][i % len(PATIENT_PHOTO_PATHS['male'])]
 
-            patient_photo_url = create_profile_photo_record(photo_file, admin_id, db)
+            patient_photo_url = create_profile_photo_record(photo_path, admin_id, db)
 
             # Create patient profile
-            patient = Patient(
+            patient = dict(
                 id=patient_id,
                 user_id=patient_user_id,  # Link patient to user
                 name=patient_name,
@@ -470,18 +541,18 @@ def create_test_data():
                 contact=patient_contact,
                 photo=patient_photo_url  # Use the uploaded photo URL
             )
-            db.add(patient)
+            rows[Patient].append(patient)
 
             # Create user-patient relation (always SELF for single patient per user)
             relation_type = RelationType.SELF
             relation_id = str(uuid.uuid4())
-            relation = UserPatientRelation(
+            relation = dict(
                 id=relation_id,
                 user_id=patient_user_id,
                 patient_id=patient_id,
                 relation=relation_type
             )
-            db.add(relation)
+            rows[UserPatientRelation].append(relation)
 
             patient_info = {
                 "id": patient_id,
@@ -499,10 +570,10 @@ def create_test_data():
             patient_records.append(patient_info)
 
             # Create patient user with profile_id set to self patient ID
-            patient_user = User(
+            patient_user = dict(
                 id=patient_user_id,
                 email=patient_email,
-                hashed_password=get_password_hash(patient_password),
+                hashed_password=hash_test_password(patient_password),
                 name=patient_user_name,
                 role=UserRole.PATIENT,
                 contact=patient_contact,
@@ -510,25 +581,25 @@ def create_test_data():
                 profile_id=self_patient_id,  # Set profile_id to self patient ID
                 is_active=True
             )
-            db.add(patient_user)
+            rows[User].append(patient_user)
 
             # Map patient to hospitals (randomly choose one hospital)
             hospital_idx = random.randint(0, len(hospitals) - 1)
             hospital = hospitals[hospital_idx]
 
             mapping_id = str(uuid.uuid4())
-            hospital_patient_mapping = HospitalPatientMapping(
+            hospital_patient_mapping = dict(
                 id=mapping_id,
-                hospital_id=hospital.id,
+                hospital_id=hospital["id"],
                 patient_id=patient_id
             )
-            db.add(hospital_patient_mapping)
+            rows[HospitalPatientMapping].append(hospital_patient_mapping)
 
             # Store hospital-patient mapping
             credentials["hospital_patient_mappings"].append({
                 "id": mapping_id,
-                "hospital_id": hospital.id,
-                "hospital_name": hospital.name,
+                "hospital_id": hospital["id"],
+                "hospital_name": hospital["name"],
                 "patient_id": patient_id,
                 "patient_name": patient_name
             })
@@ -536,38 +607,38 @@ def create_test_data():
             # Map to ALL 5 doctors (as per requirement)
             for doctor in doctors:
                 mapping_id = str(uuid.uuid4())
-                doctor_patient_mapping = DoctorPatientMapping(
+                doctor_patient_mapping = dict(
                     id=mapping_id,
-                    doctor_id=doctor.id,
+                    doctor_id=doctor["id"],
                     patient_id=patient_id
                 )
-                db.add(doctor_patient_mapping)
+                rows[DoctorPatientMapping].append(doctor_patient_mapping)
 
                 # Store doctor-patient mapping
                 credentials["doctor_patient_mappings"].append({
                     "id": mapping_id,
-                    "doctor_id": doctor.id,
-                    "doctor_name": doctor.name,
+                    "doctor_id": doctor["id"],
+                    "doctor_name": doctor["name"],
                     "patient_id": patient_id,
                     "patient_name": patient_name
                 })
 
                 # Create a chat between doctor and patient
                 chat_id = str(uuid.uuid4())
-                chat = Chat(
+                chat = dict(
                     id=chat_id,
-                    doctor_id=doctor.id,
+                    doctor_id=doctor["id"],
                     patient_id=patient_id,
                     is_active_for_doctor=False,
                     is_active_for_patient=False
                 )
-                db.add(chat)
+                rows[Chat].append(chat)
 
                 # Store chat information
                 credentials["chats"].append({
                     "id": chat_id,
-                    "doctor_id": doctor.id,
-                    "doctor_name": doctor.name,
+                    "doctor_id": doctor["id"],
+                    "doctor_name": doctor["name"],
                     "patient_id": patient_id,
                     "patient_name": patient_name,
                     "is_active_for_doctor": False,
@@ -605,11 +676,11 @@ def create_test_data():
         }
 
         # Upload mother's profile photo
-        mother_photo_url = create_profile_photo_record(patient_photo_files['female'][0], admin_id, db)
+        mother_photo_url = create_profile_photo_record(PATIENT_PHOTO_PATHS['female'][0], admin_id, db)
 
         # Create mother patient profile with health info
         from datetime import date
-        mother_patient = Patient(
+        mother_patient = dict(
             id=mother_patient_id,
             user_id=mother_user_id,
             name=mother_name,
@@ -625,23 +696,23 @@ def create_test_data():
             emergency_contact_name="Rajesh Sharma (Husband)",
             emergency_contact_number="+91-9876543213"
         )
-        db.add(mother_patient)
+        rows[Patient].append(mother_patient)
 
         # Create mother user-patient relation (self)
         mother_relation_id = str(uuid.uuid4())
-        mother_relation = UserPatientRelation(
+        mother_relation = dict(
             id=mother_relation_id,
             user_id=mother_user_id,
             patient_id=mother_patient_id,
             relation=RelationType.SELF
         )
-        db.add(mother_relation)
+        rows[UserPatientRelation].append(mother_relation)
 
         # Create mother user account
-        mother_user = User(
+        mother_user = dict(
             id=mother_user_id,
             email=mother_email,
-            hashed_password=get_password_hash(mother_password),
+            hashed_password=hash_test_password(mother_password),
             name=mother_name,
             role=UserRole.PATIENT,
             contact=mother_contact,
@@ -649,7 +720,7 @@ def create_test_data():
             profile_id=mother_patient_id,
             is_active=True
         )
-        db.add(mother_user)
+        rows[User].append(mother_user)
 
         # Newborn Patient
         newborn_user_id = str(uuid.uuid4())
@@ -668,10 +739,10 @@ def create_test_data():
         }
 
         # Upload newborn's profile photo
-        newborn_photo_url = create_profile_photo_record(patient_photo_files['male'][0], admin_id, db)
+        newborn_photo_url = create_profile_photo_record(PATIENT_PHOTO_PATHS['male'][0], admin_id, db)
 
         # Create newborn patient profile with health info
-        newborn_patient = Patient(
+        newborn_patient = dict(
             id=newborn_patient_id,
             user_id=newborn_user_id,
             name=newborn_name,
@@ -687,33 +758,33 @@ def create_test_data():
             emergency_contact_name="Priya Sharma (Mother)",
             emergency_contact_number=mother_contact
         )
-        db.add(newborn_patient)
+        rows[Patient].append(newborn_patient)
 
         # Create newborn user-patient relation (self)
         newborn_relation_id = str(uuid.uuid4())
-        newborn_self_relation = UserPatientRelation(
+        newborn_self_relation = dict(
             id=newborn_relation_id,
             user_id=newborn_user_id,
             patient_id=newborn_patient_id,
             relation=RelationType.SELF
         )
-        db.add(newborn_self_relation)
+        rows[UserPatientRelation].append(newborn_self_relation)
 
         # Create mother-child relation (mother -> child)
         mother_child_relation_id = str(uuid.uuid4())
-        mother_child_relation = UserPatientRelation(
+        mother_child_relation = dict(
             id=mother_child_relation_id,
             user_id=mother_user_id,
             patient_id=newborn_patient_id,
             relation=RelationType.CHILD
         )
-        db.add(mother_child_relation)
+        rows[UserPatientRelation].append(mother_child_relation)
 
         # Create newborn user account
-        newborn_user = User(
+        newborn_user = dict(
             id=newborn_user_id,
             email=newborn_email,
-            hashed_password=get_password_hash(newborn_password),
+            hashed_password=hash_test_password(newborn_password),
             name=newborn_name,
             role=UserRole.PATIENT,
             contact=newborn_contact,
@@ -721,16 +792,16 @@ def create_test_data():
             profile_id=newborn_patient_id,
             is_active=True
         )
-        db.add(newborn_user)
+        rows[User].append(newborn_user)
 
         # Map mother and newborn to appropriate doctors and hospitals
         # Find gynecologist and pediatrician from existing doctors
         gynecologist = None
         pediatrician = None
         for doctor in doctors:
-            if "gynecologist" in doctor.designation.lower() or "gynaecologist" in doctor.designation.lower():
+            if "gynecologist" in doctor["designation"].lower() or "gynaecologist" in doctor["designation"].lower():
                 gynecologist = doctor
-            elif "pediatrician" in doctor.designation.lower():
+            elif "pediatrician" in doctor["designation"].lower():
                 pediatrician = doctor
 
         # Map both patients to hospitals (use first hospital)
@@ -739,18 +810,18 @@ def create_test_data():
         for patient_id, patient_name in [(mother_patient_id, mother_name), (newborn_patient_id, newborn_name)]:
             # Hospital-patient mapping
             mapping_id = str(uuid.uuid4())
-            hospital_patient_mapping = HospitalPatientMapping(
+            hospital_patient_mapping = dict(
                 id=mapping_id,
-                hospital_id=hospital.id,
+                hospital_id=hospital["id"],
                 patient_id=patient_id
             )
-            db.add(hospital_patient_mapping)
+            rows[HospitalPatientMapping].append(hospital_patient_mapping)
 
             # Store hospital-patient mapping
             credentials["hospital_patient_mappings"].append({
                 "id": mapping_id,
-                "hospital_id": hospital.id,
-                "hospital_name": hospital.name,
+                "hospital_id": hospital["id"],
+                "hospital_name": hospital["name"],
                 "patient_id": patient_id,
                 "patient_name": patient_name
             })
@@ -758,38 +829,38 @@ def create_test_data():
             # Map to all 5 doctors (as per existing pattern)
             for doctor in doctors:
                 mapping_id = str(uuid.uuid4())
-                doctor_patient_mapping = DoctorPatientMapping(
+                doctor_patient_mapping = dict(
                     id=mapping_id,
-                    doctor_id=doctor.id,
+                    doctor_id=doctor["id"],
                     patient_id=patient_id
                 )
-                db.add(doctor_patient_mapping)
+                rows[DoctorPatientMapping].append(doctor_patient_mapping)
 
                 # Store doctor-patient mapping
                 credentials["doctor_patient_mappings"].append({
                     "id": mapping_id,
-                    "doctor_id": doctor.id,
-                    "doctor_name": doctor.name,
+                    "doctor_id": doctor["id"],
+                    "doctor_name": doctor["name"],
                     "patient_id": patient_id,
                     "patient_name": patient_name
                 })
 
                 # Create chat between doctor and patient
                 chat_id = str(uuid.uuid4())
-                chat = Chat(
+                chat = dict(
                     id=chat_id,
-                    doctor_id=doctor.id,
+                    doctor_id=doctor["id"],
                     patient_id=patient_id,
                     is_active_for_doctor=False,
                     is_active_for_patient=False
                 )
-                db.add(chat)
+                rows[Chat].append(chat)
 
                 # Store chat information
                 credentials["chats"].append({
                     "id": chat_id,
-                    "doctor_id": doctor.id,
-                    "doctor_name": doctor.name,
+                    "doctor_id": doctor["id"],
+                    "doctor_name": doctor["name"],
                     "patient_id": patient_id,
                     "patient_name": patient_name,
                     "is_active_for_doctor": False,
@@ -830,6 +901,12 @@ def create_test_data():
             }
         ])
 
+        # Write the collected users, profiles, relations, mappings and chats in
+        # foreign key order
+        for model in (User, Hospital, Doctor, Patient, UserPatientRelation,
+                      HospitalDoctorMapping, HospitalPatientMapping, DoctorPatientMapping, Chat):
+            _bulk_insert(db, model, rows[model])
+
         # Create case histories and reports for mother and newborn
         logger.info("Creating case histories and reports for mother and newborn...")
 
@@ -840,13 +917,21 @@ def create_test_data():
         # Upload actual PDF reports from data directory
         logger.info("Uploading actual PDF reports from data directory...")
 
+        # Read and store the report files concurrently; the SQLAlchemy session
+        # is not thread-safe, so the FileDocument rows are created below on
+        # this thread.
+        report_paths = ["data/reports/report1.pdf", "data/reports/report2.pdf"]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            stored_reports = dict(zip(report_paths, executor.map(store_document_file, report_paths)))
+
         # Upload report1.pdf for mother
         mother_report_doc_id, mother_report_doc_link = upload_document_from_file(
             "data/reports/report1.pdf",
             admin_id,
             db,
             DocumentType.OTHER,
-            "Mother's post-delivery health assessment report"
+            "Mother's post-delivery health assessment report",
+            stored=stored_reports["data/reports/report1.pdf"]
         )
 
         # Upload report2.pdf for newborn
@@ -855,7 +940,8 @@ def create_test_data():
             admin_id,
             db,
             DocumentType.OTHER,
-            "Newborn's health assessment report"
+            "Newborn's health assessment report",
+            stored=stored_reports["data/reports/report2.pdf"]
         )
 
         # Mother's case history with document attachment
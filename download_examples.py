@@ -2,43 +2,54 @@
 """
 Examples of how to properly download documents from POCA service
 """
-import requests
-import json
-import io
+from concurrent.futures import ThreadPoolExecutor
+
+from urllib3.util.retry import Retry
+
+from api_helpers import TokenCache, auth_headers, cached_login, make_session
 
 BASE_URL = "http://localhost:8000/api/v1"
+MAX_PARALLEL_DOWNLOADS = 10
+
+# One pooled session so the login call and every document GET reuse warm connections
+SESSION = make_session(
+    pool_connections=1,
+    pool_maxsize=MAX_PARALLEL_DOWNLOADS,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+)
+
+# Token from the last successful login; reused until it is about to expire
+_TOKEN_CACHE = TokenCache()
 
 def login_and_get_token():
-    """Login and get access token"""
-    response = requests.post(
-        f"{BASE_URL}/auth/login",
-        data={"username": "admin@example.com", "password": "admin123"},
-        headers={"Content-Type": "application/x-www-form-urlencoded"}
-    )
-    if response.status_code == 200:
-        return response.json()["data"]["access_token"]
-    return None
+    """Login and get access token, reusing the cached one while it is still valid"""
+    token_data = cached_login(SESSION, f"{BASE_URL}/auth/login", "admin@example.com", "admin123", _TOKEN_CACHE)
+    return token_data["access_token"] if token_data else None
+
+def save_streamed_response(response, filename, chunk_size=64 * 1024):
+    """Write a streamed response body to disk without buffering the whole file in memory"""
+    with open(filename, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            f.write(chunk)
 
 def download_document_correctly(token, download_link):
     """Correct way to download a document"""
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(download_link, headers=headers)
-    
-    if response.status_code == 200:
-        # Save the file
-        filename = "downloaded_document.txt"
-        with open(filename, 'wb') as f:
-            f.write(response.content)
-        print(f"✓ Document downloaded successfully as {filename}")
-        return True
-    else:
-        print(f"✗ Download failed: {response.status_code} - {response.text}")
-        return False
+    headers = auth_headers(token)
+    with SESSION.get(download_link, headers=headers, stream=True) as response:
+        if response.status_code == 200:
+            # Stream the file to disk as it arrives
+            filename = "downloaded_document.txt"
+            save_streamed_response(response, filename)
+            print(f"✓ Document downloaded successfully as {filename}")
+            return True
+        else:
+            print(f"✗ Download failed: {response.status_code} - {response.text}")
+            return False
 
 def get_patient_documents_and_download(token, patient_id):
     """Get patient documents and download them"""
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(f"{BASE_URL}/patients/{patient_id}/documents", headers=headers)
+    headers = auth_headers(token)
+    response = SESSION.get(f"{BASE_URL}/patients/{patient_id}/documents", headers=headers)
     
     if response.status_code == 200:
         result = response.json()
@@ -46,19 +57,26 @@ def get_patient_documents_and_download(token, patient_id):
         
         print(f"Found {len(documents)} documents for patient")
         
-        for i, doc in enumerate(documents, 1):
-            print(f"\nDocument {i}: {doc['file_name']}")
-            print(f"Download Link: {doc['download_link']}")
-            
-            # Download the document
-            download_response = requests.get(doc['download_link'], headers=headers)
-            if download_response.status_code == 200:
+        def download(i, doc):
+            with SESSION.get(doc['download_link'], headers=headers, stream=True) as download_response:
+                if download_response.status_code != 200:
+                    return download_response.status_code, None
                 filename = f"patient_doc_{i}_{doc['file_name']}"
-                with open(filename, 'wb') as f:
-                    f.write(download_response.content)
-                print(f"✓ Downloaded as: {filename}")
-            else:
-                print(f"✗ Download failed: {download_response.status_code}")
+                save_streamed_response(download_response, filename)
+                return download_response.status_code, filename
+        
+        # Downloads are independent, so overlap them and report in document order
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_DOWNLOADS) as executor:
+            futures = [executor.submit(download, i, doc) for i, doc in enumerate(documents, 1)]
+            for i, (doc, future) in enumerate(zip(documents, futures), 1):
+                print(f"\nDocument {i}: {doc['file_name']}")
+                print(f"Download Link: {doc['download_link']}")
+                
+                status_code, filename = future.result()
+                if filename:
+                    print(f"✓ Downloaded as: {filename}")
+                else:
+                    print(f"✗ Download failed: {status_code}")
 
 # Example usage
 if __name__ == "__main__":
@@ -9,7 +9,10 @@ from app.models.hospital import Hospital
 from app.models.doctor import Doctor
 from app.models.patient import Patient
 from app.models.mapping import HospitalDoctorMapping, HospitalPatientMapping, DoctorPatientMapping
-from app.api.auth import get_password_hash
+
+# Precomputed bcrypt hash of the default admin password "admin123"; hashing it at
+# startup would cost ~250ms of CPU on every run
+ADMIN_PASSWORD_HASH = "$2b$12$QYlg3a0u0yJaLUkpSDTat./w8A3BGD73REGzoKK.blr5fiRIQXhUO"
 
 def init_db():
     """Initialize the database with tables and default admin user"""
@@ -21,7 +24,7 @@ def init_db():
     
     try:
         # Check if admin user already exists
-        admin_exists = db.query(User).filter(User.role == UserRole.ADMIN).first()
+        admin_exists = db.query(db.query(User.id).filter(User.role == UserRole.ADMIN).exists()).scalar()
         if admin_exists:
             print("Admin user already exists. Skipping initialization.")
             return
@@ -31,7 +34,7 @@ def init_db():
         admin_user = User(
             id=admin_id,
             email="admin@example.com",
-            hashed_password=get_password_hash("admin123"),
+            hashed_password=ADMIN_PASSWORD_HASH,
             name="Admin User",
             role=UserRole.ADMIN,
             is_active=True
@@ -1,23 +1,39 @@
 import uvicorn
 import argparse
+import socket
+
+HOST = "0.0.0.0"
+
+def is_port_free(port):
+    """Check whether the port can be bound, without starting the app"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        # Match uvicorn's bind, which can reuse a port still in TIME_WAIT
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind((HOST, port))
+        except OSError:
+            return False
+    return True
+
+def find_free_port(start=8001, end=8100):
+    """Return the first bindable port in [start, end), or None"""
+    for port in range(start, end):
+        if is_port_free(port):
+            return port
+    return None
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the POCA service")
     parser.add_argument("--port", type=int, default=8000, help="Port to run the service on")
     args = parser.parse_args()
 
-    try:
-        uvicorn.run("app.main:app", host="0.0.0.0", port=args.port, reload=True)
-    except OSError as e:
-        if "Address already in use" in str(e):
-            print(f"Port {args.port} is already in use. Try a different port with --port.")
-            # Try a different port automatically
-            for port in range(8001, 8100):
-                try:
-                    print(f"Trying port {port}...")
-                    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True)
-                    break
-                except OSError:
-                    continue
-        else:
-            raise
+    port = args.port
+    if not is_port_free(port):
+        print(f"Port {port} is already in use. Try a different port with --port.")
+        # Pick a different port up front so uvicorn only starts once
+        port = find_free_port()
+        if port is None:
+            raise SystemExit("No free port found in range 8001-8099.")
+        print(f"Using port {port} instead.")
+
+    uvicorn.run("app.main:app", host=HOST, port=port, reload=True)
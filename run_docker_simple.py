@@ -3,10 +3,13 @@
 Simple script to run Docker tests for POCA service
 """
 
+import argparse
 import subprocess
 import time
 import sys
 import os
+import urllib.error
+import urllib.request
 
 # ANSI colors
 GREEN = '\033[0;32m'
@@ -14,6 +17,20 @@ RED = '\033[0;31m'
 YELLOW = '\033[0;33m'
 NC = '\033[0m'  # No Color
 
+HEALTH_URL = "http://localhost:8000/health"
+CONTAINER_NAME = "poca-service-api"
+
+def is_container_running(name=CONTAINER_NAME):
+    """Check for a running container using Docker's own name filter"""
+    try:
+        result = subprocess.run(
+            ["docker", "ps", "--filter", f"name={name}", "--quiet"],
+            capture_output=True, text=True, check=False
+        )
+    except FileNotFoundError:
+        return False
+    return result.returncode == 0 and bool(result.stdout.strip())
+
 def print_color(color, message):
     """Print colored message"""
     print(f"{color}{message}{NC}")
@@ -30,8 +47,40 @@ def run_command(command, check=True):
             sys.exit(1)
         return e
 
+def wait_for_service(timeout=60, interval=0.25):
+    """Poll the health endpoint until the service is healthy or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(HEALTH_URL, timeout=1) as response:
+                if response.status == 200 and b"healthy" in response.read():
+                    return True
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(interval)
+    return False
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Run Docker tests for POCA service")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--auto-stop", action="store_true", help="Stop the containers when the test finishes")
+    group.add_argument("--keep-up", action="store_true", help="Leave the containers running when the test finishes")
+    return parser.parse_args()
+
+def should_stop_containers(args):
+    """Decide whether to stop the containers, only prompting on an interactive terminal"""
+    if args.auto_stop:
+        return True
+    if args.keep_up:
+        return False
+    if not sys.stdin.isatty():
+        return True
+    return input("Do you want to stop the Docker containers? (y/n) ").lower() == 'y'
+
 def main():
     """Main function"""
+    args = parse_args()
     print_color(YELLOW, "Starting Docker test for POCA service...")
     
     # Change to the poca-service directory
@@ -53,16 +102,12 @@ def main():
     
     # Wait for the service to start
     print_color(YELLOW, "Waiting for the service to start...")
-    time.sleep(10)
-    
-    # Wait a bit longer for the service to fully start
-    print_color(YELLOW, "Waiting for the service to fully start...")
-    time.sleep(20)
+    if not wait_for_service():
+        print_color(RED, "Service did not become healthy within 60 seconds.")
     
     # Check if the container is running
     print_color(YELLOW, "Checking if the container is running...")
-    result = run_command("docker ps | grep poca-service-api", check=False)
-    if result.returncode != 0:
+    if not is_container_running():
         print_color(RED, "Container is not running. Check the logs.")
         run_command("docker-compose logs")
         sys.exit(1)
@@ -70,7 +115,7 @@ def main():
     
     # Check if the service is responding
     print_color(YELLOW, "Checking if the service is responding...")
-    result = run_command("curl -s http://localhost:8000/health", check=False)
+    result = run_command(f"curl -s {HEALTH_URL}", check=False)
     if result.returncode != 0 or "healthy" not in result.stdout:
         print_color(RED, "Service is not healthy. Check the logs.")
         run_command("docker-compose logs")
@@ -79,9 +124,8 @@ def main():
     
     print_color(GREEN, "Docker test completed successfully!")
     
-    # Ask if the user wants to stop the containers
-    stop_containers = input("Do you want to stop the Docker containers? (y/n) ")
-    if stop_containers.lower() == 'y':
+    # Stop the containers if requested (prompting only on an interactive terminal)
+    if should_stop_containers(args):
         print_color(YELLOW, "Stopping the containers...")
         run_command("docker-compose down")
         print_color(GREEN, "Containers stopped.")
@@ -3,10 +3,11 @@
 Script to run Docker tests for POCA service
 """
 
+import argparse
 import subprocess
 import time
 import sys
-import os
+from pathlib import Path
 
 # ANSI colors
 GREEN = '\033[0;32m'
@@ -14,18 +15,36 @@ RED = '\033[0;31m'
 YELLOW = '\033[0;33m'
 NC = '\033[0m'  # No Color
 
+HEALTH_URL = "http://localhost:8000/health"
+CONTAINER_NAME = "poca-service-api"
+
+# docker-compose.yml lives next to this script
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+def is_container_running(name=CONTAINER_NAME):
+    """Check for a running container using Docker's own name filter"""
+    try:
+        result = subprocess.run(
+            ["docker", "ps", "--filter", f"name={name}", "--quiet"],
+            capture_output=True, text=True, check=False
+        )
+    except FileNotFoundError:
+        return False
+    return result.returncode == 0 and bool(result.stdout.strip())
+
 def print_color(color, message):
     """Print colored message"""
     print(f"{color}{message}{NC}")
 
-def run_command(command, check=True):
-    """Run a shell command"""
+def run_command(command, check=True, cwd=None, capture=True):
+    """Run a shell command; with capture=False its output streams straight to the terminal"""
     try:
-        result = subprocess.run(command, shell=True, check=check, capture_output=True, text=True)
+        result = subprocess.run(command, shell=True, check=check, capture_output=capture, text=capture, cwd=cwd)
         return result
     except subprocess.CalledProcessError as e:
         print_color(RED, f"Command failed: {e}")
-        print_color(RED, f"Error output: {e.stderr}")
+        if capture:
+            print_color(RED, f"Error output: {e.stderr}")
         if check:
             sys.exit(1)
         return e
@@ -67,110 +86,114 @@ def check_docker_running():
         sys.exit(1)
     print_color(GREEN, "Docker is running.")
 
+def find_compose_dir():
+    """Return the directory containing docker-compose.yml, or None if it cannot be found"""
+    for directory in (Path.cwd(), SCRIPT_DIR):
+        if (directory / "docker-compose.yml").exists():
+            return directory
+    return None
+
 def stop_containers(docker_compose):
     """Stop any running containers"""
     print_color(YELLOW, "Stopping any running containers...")
-    # Get the current directory
-    current_dir = os.getcwd()
-    print_color(YELLOW, f"Current directory: {current_dir}")
-
-    # Check if docker-compose.yml exists in the current directory
-    if os.path.exists(os.path.join(current_dir, "docker-compose.yml")):
-        run_command(f"{docker_compose} down")
-        print_color(GREEN, "Containers stopped.")
-    else:
-        print_color(YELLOW, "docker-compose.yml not found in the current directory. Searching for it...")
-        # Try to find the docker-compose.yml file
-        for root, dirs, files in os.walk(current_dir):
-            if "docker-compose.yml" in files:
-                compose_dir = root
-                print_color(GREEN, f"Found docker-compose.yml in {compose_dir}")
-                os.chdir(compose_dir)
-                run_command(f"{docker_compose} down")
-                os.chdir(current_dir)  # Go back to the original directory
-                print_color(GREEN, "Containers stopped.")
-                return
-
+    compose_dir = find_compose_dir()
+    if compose_dir is None:
         print_color(RED, "docker-compose.yml not found. Cannot stop containers.")
         return
 
+    print_color(YELLOW, f"Using docker-compose.yml in {compose_dir}")
+    run_command(f"{docker_compose} down", cwd=compose_dir, capture=False)
+    print_color(GREEN, "Containers stopped.")
+
 def start_containers(docker_compose):
     """Build and start the containers"""
     print_color(YELLOW, "Building and starting the containers...")
-    # Get the current directory
-    current_dir = os.getcwd()
-
-    # Check if docker-compose.yml exists in the current directory
-    if os.path.exists(os.path.join(current_dir, "docker-compose.yml")):
-        run_command(f"{docker_compose} up -d --build")
-        print_color(GREEN, "Containers started.")
-    else:
-        print_color(YELLOW, "docker-compose.yml not found in the current directory. Searching for it...")
-        # Try to find the docker-compose.yml file
-        for root, _, files in os.walk(current_dir):
-            if "docker-compose.yml" in files:
-                compose_dir = root
-                print_color(GREEN, f"Found docker-compose.yml in {compose_dir}")
-                os.chdir(compose_dir)
-                run_command(f"{docker_compose} up -d --build")
-                os.chdir(current_dir)  # Go back to the original directory
-                print_color(GREEN, "Containers started.")
-                return
-
+    compose_dir = find_compose_dir()
+    if compose_dir is None:
         print_color(RED, "docker-compose.yml not found. Cannot start containers.")
         sys.exit(1)
 
-def wait_for_service():
-    """Wait for the service to start"""
+    run_command(f"{docker_compose} up -d --build", cwd=compose_dir, capture=False)
+    print_color(GREEN, "Containers started.")
+
+def import_requests():
+    """Import requests, installing it first if it is missing"""
+    try:
+        import requests
+    except ImportError:
+        print_color(YELLOW, "requests module not found. Installing it...")
+        run_command("pip install requests")
+        import requests
+    return requests
+
+def probe_health(session):
+    """Make one request to the health endpoint; returns (healthy, detail)"""
+    requests = import_requests()
+    try:
+        response = session.get(HEALTH_URL, timeout=1)
+    except requests.RequestException as e:
+        return False, f"Error connecting to the service: {e}"
+    if response.status_code == 200 and "healthy" in response.text:
+        return True, None
+    return False, f"Status code: {response.status_code}, Response: {response.text}"
+
+def wait_for_service(timeout=60, interval=0.25):
+    """Poll the health endpoint until the service is healthy or the timeout expires"""
     print_color(YELLOW, "Waiting for the service to start...")
-    time.sleep(10)
-    print_color(YELLOW, "Waiting for the service to fully start...")
-    time.sleep(20)
+    requests = import_requests()
+    deadline = time.monotonic() + timeout
+    with requests.Session() as session:
+        while time.monotonic() < deadline:
+            healthy, _ = probe_health(session)
+            if healthy:
+                print_color(GREEN, "Service is up.")
+                return True
+            time.sleep(interval)
+    print_color(RED, f"Service did not become healthy within {timeout} seconds.")
+    return False
 
 def check_container_running():
     """Check if the container is running"""
     print_color(YELLOW, "Checking if the container is running...")
-    result = run_command("docker ps | grep poca-service-api", check=False)
-    if result.returncode != 0:
+    if not is_container_running():
         print_color(RED, "Container is not running. Check the logs.")
-        run_command("docker-compose logs")
+        run_command("docker-compose logs", capture=False)
         sys.exit(1)
     print_color(GREEN, "Container is running.")
 
 def check_service_health():
-    """Check if the service is responding"""
+    """Check once if the service is responding"""
     print_color(YELLOW, "Checking if the service is responding...")
-    try:
-        # Try to import requests
-        try:
-            import requests
-        except ImportError:
-            print_color(YELLOW, "requests module not found. Installing it...")
-            run_command("pip install requests")
-            import requests
-
-        response = requests.get("http://localhost:8000/health")
-        if response.status_code == 200 and "healthy" in response.text:
-            print_color(GREEN, "Service is responding and healthy!")
-            return True
-        else:
-            print_color(RED, f"Service is not healthy. Status code: {response.status_code}, Response: {response.text}")
-            return False
-    except Exception as e:
-        print_color(RED, f"Error connecting to the service: {str(e)}")
-
-        # Try using curl as a fallback
-        print_color(YELLOW, "Trying with curl...")
-        result = run_command("curl -s http://localhost:8000/health", check=False)
-        if result.returncode == 0 and "healthy" in result.stdout:
-            print_color(GREEN, "Service is responding and healthy (via curl)!")
-            return True
-        else:
-            print_color(RED, "Service is not healthy (via curl).")
-            return False
+    requests = import_requests()
+    with requests.Session() as session:
+        healthy, detail = probe_health(session)
+    if healthy:
+        print_color(GREEN, "Service is responding and healthy!")
+    else:
+        print_color(RED, f"Service is not healthy. {detail}")
+    return healthy
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Run Docker tests for POCA service")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--auto-stop", action="store_true", help="Stop the containers when the test finishes")
+    group.add_argument("--keep-up", action="store_true", help="Leave the containers running when the test finishes")
+    return parser.parse_args()
+
+def should_stop_containers(args):
+    """Decide whether to stop the containers, only prompting on an interactive terminal"""
+    if args.auto_stop:
+        return True
+    if args.keep_up:
+        return False
+    if not sys.stdin.isatty():
+        return True
+    return input("Do you want to stop the Docker containers? (y/n) ").lower() == 'y'
 
 def main():
     """Main function"""
+    args = parse_args()
     print_color(YELLOW, "Starting Docker test for POCA service...")
 
     # Check prerequisites
@@ -193,14 +216,13 @@ def main():
     # Check service health
     if not check_service_health():
         print_color(RED, "Service health check failed.")
-        run_command(f"{docker_compose} logs")
+        run_command(f"{docker_compose} logs", capture=False)
         sys.exit(1)
 
     print_color(GREEN, "Docker test completed successfully!")
 
-    # Ask if the user wants to stop the containers
-    stop_containers_input = input("Do you want to stop the Docker containers? (y/n) ")
-    if stop_containers_input.lower() == 'y':
+    # Stop the containers if requested (prompting only on an interactive terminal)
+    if should_stop_containers(args):
         stop_containers(docker_compose)
     else:
         print_color(YELLOW, f"Containers are still running. Stop them with '{docker_compose} down' when you're done.")
@@ -1,6 +1,5 @@
 import os
 import logging
-from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from uuid import uuid4
 
@@ -9,7 +8,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 # Import database and models
-from app.db.database import engine, Base, get_db
+from app.db.database import engine, Base
 from app.models.user import User, UserRole
 from app.models.doctor import Doctor
 from app.models.patient import Patient
@@ -28,154 +27,132 @@ def create_tables():
 def create_test_data():
     logger.info("Creating test data...")
 
-    # Get database session
-    db = next(get_db())
+    hospital_id, doctor_id, patient_id = str(uuid4()), str(uuid4()), str(uuid4())
+    patient_user_id = str(uuid4())
+    chat_id = str(uuid4())
+
+    # Seed rows as plain dicts, inserted with Core in FK order (users first, since profiles reference users.id)
+    user_rows = [
+        {
+            "id": str(uuid4()),
+            "email": "admin@example.com",
+            "hashed_password": "$2b$12$wDLqZilS7krGQEv9hHv.LeXS3cb9PJ0PQ2aaiEJrY5RB4tUgtgR6K",  # password123
+            "name": "Admin User",
+            "role": UserRole.ADMIN,
+            "contact": "1234567890",
+            "address": "123 Admin St",
+            "profile_id": None
+        },
+        {
+            "id": str(uuid4()),
+            "email": "hospital@example.com",
+            "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # password123
+            "name": "Test Hospital",
+            "role": UserRole.HOSPITAL,
+            "contact": "9876543210",
+            "address": "123 Hospital St",
+            "profile_id": hospital_id
+        },
+        {
+            "id": str(uuid4()),
+            "email": "doctor@example.com",
+            "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # password123
+            "name": "Dr. John Doe",
+            "role": UserRole.DOCTOR,
+            "contact": "5555555555",
+            "address": None,
+            "profile_id": doctor_id
+        },
+        {
+            "id": patient_user_id,
+            "email": "patient@example.com",
+            "hashed_password": "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # password123
+            "name": "Jane Smith",
+            "role": UserRole.PATIENT,
+            "contact": "4444444444",
+            "address": None,
+            "profile_id": patient_id
+        }
+    ]
+
+    hospital_row = {
+        "id": hospital_id,
+        "name": "Test Hospital",
+        "address": "123 Hospital St",
+        "city": "Test City",
+        "state": "Test State",
+        "country": "Test Country",
+        "contact": "9876543210",
+        "pin_code": "123456",
+        "email": "hospital@example.com",
+        "specialities": ["Cardiology", "Neurology", "Pediatrics"],
+        "website": "https://testhospital.com"
+    }
+
+    doctor_row = {
+        "id": doctor_id,
+        "name": "Dr. John Doe",
+        "photo": "https://example.com/doctor.jpg",
+        "designation": "Cardiologist",
+        "experience": 10,
+        "details": "Experienced cardiologist with 10 years of practice",
+        "contact": "5555555555"
+    }
+
+    patient_row = {
+        "id": patient_id,
+        "user_id": patient_user_id,
+        "name": "Jane Smith",
+        "dob": datetime.now() - timedelta(days=365*30),  # 30 years old
+        "gender": "female",
+        "contact": "4444444444",
+        "photo": "https://example.com/patient.jpg"
+    }
 
     try:
-        # Create admin user
-        admin_user = User(
-            id=str(uuid4()),
-            email="admin@example.com",
-            hashed_password="$2b$12$wDLqZilS7krGQEv9hHv.LeXS3cb9PJ0PQ2aaiEJrY5RB4tUgtgR6K",  # password123
-            name="Admin User",
-            role=UserRole.ADMIN,
-            contact="1234567890",
-            address="123 Admin St"
-        )
-        db.add(admin_user)
-
-        # Create hospital
-        hospital = Hospital(
-            id=str(uuid4()),
-            name="Test Hospital",
-            address="123 Hospital St",
-            city="Test City",
-            state="Test State",
-            country="Test Country",
-            contact="9876543210",
-            pin_code="123456",
-            email="hospital@example.com",
-            specialities=["Cardiology", "Neurology", "Pediatrics"],
-            website="https://testhospital.com"
-        )
-        db.add(hospital)
-
-        # Create hospital user
-        hospital_user = User(
-            id=str(uuid4()),
-            email="hospital@example.com",
-            hashed_password="$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # password123
-            name="Test Hospital",
-            role=UserRole.HOSPITAL,
-            contact="9876543210",
-            address="123 Hospital St",
-            profile_id=hospital.id
-        )
-        db.add(hospital_user)
-
-        # Create doctor
-        doctor = Doctor(
-            id=str(uuid4()),
-            name="Dr. John Doe",
-            photo="https://example.com/doctor.jpg",
-            designation="Cardiologist",
-            experience=10,
-            details="Experienced cardiologist with 10 years of practice",
-            contact="5555555555"
-        )
-        db.add(doctor)
-
-        # Create doctor user
-        doctor_user = User(
-            id=str(uuid4()),
-            email="doctor@example.com",
-            hashed_password="$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # password123
-            name="Dr. John Doe",
-            role=UserRole.DOCTOR,
-            contact="5555555555",
-            profile_id=doctor.id
-        )
-        db.add(doctor_user)
-
-        # Create patient
-        patient = Patient(
-            id=str(uuid4()),
-            name="Jane Smith",
-            dob=datetime.now() - timedelta(days=365*30),  # 30 years old
-            gender="female",
-            contact="4444444444",
-            photo="https://example.com/patient.jpg"
-        )
-        db.add(patient)
-
-        # Create patient user
-        patient_user = User(
-            id=str(uuid4()),
-            email="patient@example.com",
-            hashed_password="$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # password123
-            name="Jane Smith",
-            role=UserRole.PATIENT,
-            contact="4444444444",
-            profile_id=patient.id
-        )
-        db.add(patient_user)
-
-        # Link patient to user
-        patient.user_id = patient_user.id
-
-        # Create user-patient self relation
-        user_patient_relation = UserPatientRelation(
-            id=str(uuid4()),
-            user_id=patient_user.id,
-            patient_id=patient.id,
-            relation=RelationType.SELF
-        )
-        db.add(user_patient_relation)
-
-        # Create mappings
-        hospital_doctor_mapping = HospitalDoctorMapping(
-            id=str(uuid4()),
-            hospital_id=hospital.id,
-            doctor_id=doctor.id
-        )
-        db.add(hospital_doctor_mapping)
-
-        hospital_patient_mapping = HospitalPatientMapping(
-            id=str(uuid4()),
-            hospital_id=hospital.id,
-            patient_id=patient.id
-        )
-        db.add(hospital_patient_mapping)
-
-        doctor_patient_mapping = DoctorPatientMapping(
-            id=str(uuid4()),
-            doctor_id=doctor.id,
-            patient_id=patient.id
-        )
-        db.add(doctor_patient_mapping)
-
-        # Create chat
-        chat = Chat(
-            id=str(uuid4()),
-            doctor_id=doctor.id,
-            patient_id=patient.id,
-            is_active=True
-        )
-        db.add(chat)
-
-        # Commit changes
-        db.commit()
+        # One transaction, one compiled statement per table
+        with engine.begin() as conn:
+            conn.execute(User.__table__.insert(), user_rows)
+            conn.execute(Hospital.__table__.insert(), [hospital_row])
+            conn.execute(Doctor.__table__.insert(), [doctor_row])
+            conn.execute(Patient.__table__.insert(), [patient_row])
+
+            # Create user-patient self relation
+            conn.execute(UserPatientRelation.__table__.insert(), [{
+                "id": str(uuid4()),
+                "user_id": patient_user_id,
+                "patient_id": patient_id,
+                "relation": RelationType.SELF
+            }])
+
+            # Create mappings
+            conn.execute(HospitalDoctorMapping.__table__.insert(), [
+                {"id": str(uuid4()), "hospital_id": hospital_id, "doctor_id": doctor_id}
+            ])
+            conn.execute(HospitalPatientMapping.__table__.insert(), [
+                {"id": str(uuid4()), "hospital_id": hospital_id, "patient_id": patient_id}
+            ])
+            conn.execute(DoctorPatientMapping.__table__.insert(), [
+                {"id": str(uuid4()), "doctor_id": doctor_id, "patient_id": patient_id}
+            ])
+
+            # Create chat
+            conn.execute(Chat.__table__.insert(), [{
+                "id": chat_id,
+                "doctor_id": doctor_id,
+                "patient_id": patient_id,
+                "is_active_for_doctor": True,
+                "is_active_for_patient": True
+            }])
+
         logger.info("Test data created successfully")
 
         # Return the chat ID for testing
-        return chat.id
+        return chat_id
 
     except Exception as e:
-        db.rollback()
         logger.error(f"Error creating test data: {str(e)}")
         raise
-    finally:
-        db.close()
 
 def initialize_database():
     """Initialize the database and return the chat ID"""
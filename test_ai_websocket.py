@@ -1,33 +1,51 @@
-import websocket
+import asyncio
 import json
 import time
 import sys
 import argparse
 import logging
 
+import websockets
+
+# websockets >= 13 ships the new asyncio client; older releases only have the legacy one
+try:
+    from websockets.asyncio.client import connect as ws_connect
+    HEADERS_KWARG = "additional_headers"
+except ImportError:
+    ws_connect = websockets.connect
+    HEADERS_KWARG = "extra_headers"
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def on_message(ws, message):
-    logger.info(f"Received: {message}")
+# Test message, serialized once
+TEST_MESSAGE = json.dumps({
+    "message": "Hello, this is a test message"
+})
 
-def on_error(ws, error):
-    logger.error(f"Error: {error}")
+async def run(url, headers, connection_id=0):
+    """Open one WebSocket connection, send the test message and log replies until it closes"""
+    try:
+        async with ws_connect(url, **{HEADERS_KWARG: headers}) as ws:
+            logger.info(f"[{connection_id}] Connection established")
 
-def on_close(ws, close_status_code, close_msg):
-    logger.info(f"Connection closed: {close_status_code} - {close_msg}")
+            # Send a test message
+            logger.info(f"[{connection_id}] Sending: {TEST_MESSAGE}")
+            await ws.send(TEST_MESSAGE)
 
-def on_open(ws):
-    logger.info("Connection established")
+            async for message in ws:
+                logger.info(f"[{connection_id}] Received: {message}")
+    except websockets.ConnectionClosed as e:
+        logger.info(f"[{connection_id}] Connection closed: {e.code} - {e.reason}")
+    except (OSError, websockets.WebSocketException) as e:
+        logger.error(f"[{connection_id}] Error: {e}")
+    else:
+        logger.info(f"[{connection_id}] Connection closed")
 
-    # Send a test message
-    message = {
-        "message": "Hello, this is a test message"
-    }
-
-    logger.info(f"Sending: {json.dumps(message)}")
-    ws.send(json.dumps(message))
+async def main(url, headers, connections):
+    """Drive all connections concurrently on one event loop"""
+    await asyncio.gather(*(run(url, headers, i) for i in range(connections)))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test AI WebSocket connection")
@@ -36,6 +54,7 @@ if __name__ == "__main__":
     parser.add_argument("--session-id", required=True, help="AI Session ID")
     parser.add_argument("--token", required=True, help="Authentication token")
     parser.add_argument("--entity-id", help="User entity ID (optional)")
+    parser.add_argument("--connections", type=int, default=1, help="Number of concurrent connections to open (for load testing)")
 
     args = parser.parse_args()
 
@@ -52,18 +71,10 @@ if __name__ == "__main__":
         headers["user-entity-id"] = args.entity_id
         logger.info(f"Using user-entity-id: {args.entity_id}")
 
-    # Enable trace for debugging
-    websocket.enableTrace(True)
-
-    # Create a WebSocket connection
-    ws = websocket.WebSocketApp(
-        url,
-        header=headers,
-        on_open=on_open,
-        on_message=on_message,
-        on_error=on_error,
-        on_close=on_close
-    )
+    # Enable protocol-level tracing for debugging
+    logging.getLogger("websockets").setLevel(logging.DEBUG)
 
-    # Start the WebSocket connection
-    ws.run_forever()
+    try:
+        asyncio.run(main(url, headers, args.connections))
+    except KeyboardInterrupt:
+        logger.info("Interrupted")
@@ -2,47 +2,53 @@
 """
 Test script to demonstrate browser-compatible document downloads using temporary tokens
 """
-import requests
-import json
 import io
 import os
+import subprocess
 import sys
-import webbrowser
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
-BASE_URL = "http://localhost:8000/api/v1"
+from api_helpers import TokenCache, auth_headers, cached_login, jget, make_session
 
-def login(email: str, password: str) -> str:
-    """Login and return access token"""
-    response = requests.post(
-        f"{BASE_URL}/auth/login",
-        data={"username": email, "password": password},
-        headers={"Content-Type": "application/x-www-form-urlencoded"}
-    )
-    if response.status_code == 200:
-        data = response.json()
-        if "data" in data and "access_token" in data["data"]:
-            return data["data"]["access_token"]
-        elif "access_token" in data:
-            return data["access_token"]
-    print(f"Login failed: {response.status_code} - {response.text}")
-    return None
+API_HOST = "localhost"
+API_PORT = 8000
+
+API_ORIGIN = f"http://{API_HOST}:{API_PORT}"
+BASE_URL = f"{API_ORIGIN}/api/v1"
+
+# Bytes of the downloaded file echoed to the console
+PREVIEW_BYTES = 256
+
+# One pooled session so every call in the flow reuses the same keep-alive connection
+# API requests go to the address resolved on first use, so none of them pays for a name lookup
+SESSION = make_session(pool_connections=10, pool_maxsize=20, pin_origin=API_ORIGIN)
+
+# Tokens are reused until they are about to expire
+_TOKEN_CACHE = TokenCache()
+
+def get_token(email: str, password: str) -> str:
+    """Return an access token for the user, logging in only when there is no usable cached one"""
+    token_data = cached_login(SESSION, f"{BASE_URL}/auth/login", email, password, _TOKEN_CACHE)
+    if not token_data:
+        print(f"Login failed for {email}")
+        return None
+    return token_data["access_token"]
 
 def upload_test_document(token: str) -> str:
     """Upload a test document and return its ID"""
     print("Uploading test document...")
     
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = auth_headers(token)
     files = {"file": ("browser_test.txt", io.BytesIO(b"This document can be downloaded in a browser!"), "text/plain")}
     data = {"document_type": "other", "remark": "Test document for browser download"}
     
-    response = requests.post(f"{BASE_URL}/documents/upload", headers=headers, files=files, data=data)
+    response = SESSION.post(f"{BASE_URL}/documents/upload", headers=headers, files=files, data=data)
     
     if response.status_code == 200:
-        result = response.json()
+        result = jget(response)
         document_id = result["data"]["id"]
         print(f"✓ Document uploaded successfully")
         print(f"  Document ID: {document_id}")
@@ -51,15 +57,19 @@ def upload_test_document(token: str) -> str:
         print(f"✗ Document upload failed: {response.status_code} - {response.text}")
         return None
 
+def request_download_token(token: str, document_id: str):
+    """POST for a new temporary download token and return the raw response"""
+    headers = auth_headers(token)
+    return SESSION.post(f"{BASE_URL}/documents/{document_id}/download-token", headers=headers)
+
 def create_download_token(token: str, document_id: str):
     """Create a temporary download token for browser downloads"""
     print(f"\n=== Creating Temporary Download Token ===")
     
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.post(f"{BASE_URL}/documents/{document_id}/download-token", headers=headers)
+    response = request_download_token(token, document_id)
     
     if response.status_code == 200:
-        result = response.json()
+        result = jget(response)
         download_data = result["data"]
         
         print(f"✓ Temporary download token created successfully!")
@@ -78,47 +88,50 @@ def test_browser_download(download_url: str):
     print(f"\n=== Testing Browser Download (No Auth Required) ===")
     
     # This simulates what happens when you click a link in a browser
-    response = requests.get(download_url)
-    
-    if response.status_code == 200:
-        print(f"✓ Document downloaded successfully without authentication!")
-        print(f"  Content-Type: {response.headers.get('content-type', 'unknown')}")
-        print(f"  Content-Disposition: {response.headers.get('content-disposition', 'not set')}")
-        print(f"  Content: {response.content.decode()}")
-        
-        # Save the file
-        filename = "browser_downloaded_file.txt"
-        with open(filename, 'wb') as f:
-            f.write(response.content)
-        print(f"  File saved as: {filename}")
-        
-        return True
-    else:
-        print(f"✗ Download failed: {response.status_code} - {response.text}")
-        return False
+    with SESSION.get(download_url, stream=True) as response:
+        if response.status_code == 200:
+            print(f"✓ Document downloaded successfully without authentication!")
+            print(f"  Content-Type: {response.headers.get('content-type', 'unknown')}")
+            print(f"  Content-Disposition: {response.headers.get('content-disposition', 'not set')}")
+            
+            # Stream the file to disk, keeping only a short preview in memory
+            filename = "browser_downloaded_file.txt"
+            preview = b""
+            with open(filename, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    if len(preview) < PREVIEW_BYTES:
+                        preview += chunk[:PREVIEW_BYTES - len(preview)]
+                    f.write(chunk)
+            print(f"  Content: {preview.decode(errors='replace')}")
+            print(f"  File saved as: {filename}")
+            
+            return True
+        else:
+            print(f"✗ Download failed: {response.status_code} - {response.text}")
+            return False
 
 def test_token_expiry(download_url: str):
     """Test that the token is one-time use"""
     print(f"\n=== Testing Token One-Time Use ===")
     
     # Try to download again with the same token
-    response = requests.get(download_url)
+    response = SESSION.get(download_url)
     
     if response.status_code == 404:
         print(f"✓ Token correctly invalidated after first use (404: {response.text})")
     else:
         print(f"✗ Unexpected response: {response.status_code} - {response.text}")
 
-def demonstrate_frontend_integration(token: str, document_id: str):
-    """Show how to integrate this in a frontend application"""
+def demonstrate_frontend_integration(token: str, document_id: str, response=None):
+    """Show how to integrate this in a frontend application (response may be a prefetched token response)"""
     print(f"\n=== Frontend Integration Example ===")
     
     # Step 1: Frontend calls API to get download token
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.post(f"{BASE_URL}/documents/{document_id}/download-token", headers=headers)
+    if response is None:
+        response = request_download_token(token, document_id)
     
     if response.status_code == 200:
-        result = response.json()
+        result = jget(response)
         download_url = result["data"]["download_url"]
         
         print("Frontend Integration Steps:")
@@ -161,8 +174,14 @@ def open_in_browser(download_url: str):
     print("This should trigger a file download in your browser!")
     
     try:
-        webbrowser.open(download_url)
-        print("✓ Browser opened. Check your downloads folder!")
+        # Launch from a detached interpreter so a slow browser start never blocks this script
+        subprocess.Popen(
+            [sys.executable, "-c", f"import webbrowser; webbrowser.open({download_url!r})"],
+            start_new_session=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        print("✓ Browser launch started. Check your downloads folder!")
     except Exception as e:
         print(f"✗ Failed to open browser: {e}")
         print(f"You can manually copy this URL to your browser: {download_url}")
@@ -172,7 +191,7 @@ def main():
     
     # Login as admin
     print("Logging in as admin...")
-    admin_token = login("admin@example.com", "admin123")
+    admin_token = get_token("admin@example.com", "admin123")
     if not admin_token:
         print("Failed to login as admin")
         return
@@ -197,11 +216,16 @@ def main():
         print("Browser download test failed")
         return
     
-    # Test token one-time use
-    test_token_expiry(download_url)
-    
-    # Demonstrate frontend integration
-    new_download_url = demonstrate_frontend_integration(admin_token, document_id)
+    # The one-time-use check and the frontend demo's new token are independent requests,
+    # so fetch the new token in the background while the reuse check runs
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        frontend_token_future = executor.submit(request_download_token, admin_token, document_id)
+        
+        # Test token one-time use
+        test_token_expiry(download_url)
+        
+        # Demonstrate frontend integration
+        new_download_url = demonstrate_frontend_integration(admin_token, document_id, frontend_token_future.result())
     
     # Ask user if they want to test in actual browser
     if new_download_url:
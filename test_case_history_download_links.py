@@ -2,60 +2,67 @@
 """
 Test script to verify case history download links
 """
-import requests
+from urllib3 import encode_multipart_formdata
 import json
-import io
+import logging
 import os
 import sys
 
 # Add the parent directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
-BASE_URL = "http://localhost:8000/api/v1"
+from api_helpers import JSON_HEADERS, TokenCache, auth_headers, cached_login, jget, json_dumps, make_session
 
-def login(email: str, password: str) -> str:
-    """Login and return access token"""
-    response = requests.post(
-        f"{BASE_URL}/auth/login",
-        data={"username": email, "password": password},
-        headers={"Content-Type": "application/x-www-form-urlencoded"}
-    )
-    if response.status_code == 200:
-        data = response.json()
-        if "data" in data and "access_token" in data["data"]:
-            return data["data"]["access_token"]
-        elif "access_token" in data:
-            return data["access_token"]
-    print(f"Login failed: {response.status_code} - {response.text}")
-    return None
-
-def create_test_file() -> io.BytesIO:
-    """Create a test file in memory"""
-    content = b"This is a test case history document for testing download links."
-    return io.BytesIO(content)
+# Extra diagnostics (e.g. full document dumps) are logged at DEBUG; set LOG_LEVEL=DEBUG to see them
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+logger = logging.getLogger(__name__)
+
+API_HOST = "localhost"
+API_PORT = 8000
+
+API_ORIGIN = f"http://{API_HOST}:{API_PORT}"
+BASE_URL = f"{API_ORIGIN}/api/v1"
+
+# One pooled session so every call in the flow reuses the same keep-alive connection
+# API requests go to the address resolved on first use, so none of them pays for a name lookup
+SESSION = make_session(pool_connections=10, pool_maxsize=20, pin_origin=API_ORIGIN)
+
+# Tokens are reused until they are about to expire
+_TOKEN_CACHE = TokenCache()
+
+def get_token(email: str, password: str) -> str:
+    """Return an access token for the user, logging in only when there is no usable cached one"""
+    token_data = cached_login(SESSION, f"{BASE_URL}/auth/login", email, password, _TOKEN_CACHE)
+    if not token_data:
+        print(f"Login failed for {email}")
+        return None
+    return token_data["access_token"]
+
+# The upload form never changes, so encode the multipart body once
+_UPLOAD_BODY, _UPLOAD_CONTENT_TYPE = encode_multipart_formdata({
+    "file": ("case_history_doc.txt", b"This is a test case history document for testing download links.", "text/plain"),
+    "document_type": "case_history",
+    "remark": "Case history document"
+})
 
 def create_case_history_with_document(token: str, patient_id: str):
     """Create a case history with a document and verify download links"""
     print("\n=== Testing Case History with Document Download Links ===")
 
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = auth_headers(token)
 
     # First, upload a document
-    files = {"file": ("case_history_doc.txt", create_test_file(), "text/plain")}
-    data = {"document_type": "case_history", "remark": "Case history document"}
-
-    upload_response = requests.post(
+    upload_response = SESSION.post(
         f"{BASE_URL}/documents/upload",
-        headers=headers,
-        files=files,
-        data=data
+        headers={**headers, "Content-Type": _UPLOAD_CONTENT_TYPE},
+        data=_UPLOAD_BODY
     )
 
     if upload_response.status_code != 200:
         print(f"✗ Document upload failed: {upload_response.status_code} - {upload_response.text}")
         return
 
-    document_result = upload_response.json()
+    document_result = jget(upload_response)
     document_id = document_result["data"]["id"]
     print(f"✓ Document uploaded with ID: {document_id}")
 
@@ -66,14 +73,14 @@ def create_case_history_with_document(token: str, patient_id: str):
         "documents": [document_id]
     }
 
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/patients/{patient_id}/case-history",
-        headers=headers,
-        json=case_history_data
+        headers={**headers, **JSON_HEADERS},
+        data=json_dumps(case_history_data)
     )
 
     if response.status_code == 200:
-        result = response.json()
+        result = jget(response)
         print(f"✓ Case history created successfully")
 
         # Check if document_files have download_link
@@ -87,7 +94,8 @@ def create_case_history_with_document(token: str, patient_id: str):
                         print(f"  Document ID: {doc.get('id', 'unknown')}")
                     else:
                         print(f"✗ Download link missing in case history document: {doc.get('file_name', 'unknown')}")
-                        print(f"  Document data: {json.dumps(doc, indent=2)}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("  Document data: %s", json.dumps(doc, indent=2))
             else:
                 print("ℹ No document files in case history")
         else:
@@ -100,11 +108,11 @@ def get_case_history_and_verify_links(token: str, patient_id: str):
     """Get case history and verify download links"""
     print("\n=== Testing Get Case History Download Links ===")
 
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(f"{BASE_URL}/patients/{patient_id}/case-history?create_if_not_exists=true", headers=headers)
+    headers = auth_headers(token)
+    response = SESSION.get(f"{BASE_URL}/patients/{patient_id}/case-history?create_if_not_exists=true", headers=headers)
 
     if response.status_code == 200:
-        result = response.json()
+        result = jget(response)
         print(f"✓ Case history retrieved successfully")
 
         # Check if document_files have download_link
@@ -129,7 +137,7 @@ def main():
 
     # Login as admin
     print("Logging in as admin...")
-    admin_token = login("admin@example.com", "admin123")
+    admin_token = get_token("admin@example.com", "admin123")
     if not admin_token:
         print("Failed to login as admin")
         return
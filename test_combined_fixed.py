@@ -8,28 +8,53 @@ admin login, mapping operations, and basic API functionality.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import argparse
+import atexit
+import functools
+import hashlib
 import json
 import logging
+import logging.handlers
+import os
+import queue
+import socket
 import sys
 import random
-import string
-import subprocess
-from typing import Dict, Optional, Tuple
-from datetime import datetime, timedelta
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('combined_fixed_test.log')
-    ]
-)
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Use orjson for response bodies when available
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Configure logging: records are queued and written to stdout and the log file
+# by a background listener, so request threads never block on log I/O
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_console_handler = logging.StreamHandler(sys.stdout)
+_log_handlers = [
+    _console_handler,
+    logging.FileHandler('combined_fixed_test.log')
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+logging.getLogger().addHandler(logging.handlers.QueueHandler(_log_queue))
+logging.getLogger().setLevel(logging.INFO)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger('combined_fixed_test')
 
-# API URLs
-BASE_URL = "http://localhost:8000/api/v1"
+# API URLs (set TEST_BASE_URL to point the suite at another server)
+BASE_URL = os.environ.get("TEST_BASE_URL", "http://localhost:8000/api/v1")
 AUTH_URL = f"{BASE_URL}/auth"
 USERS_URL = f"{BASE_URL}/users"
 DOCTORS_URL = f"{BASE_URL}/doctors"
@@ -40,14 +65,27 @@ CHATS_URL = f"{BASE_URL}/chats"
 MESSAGES_URL = f"{BASE_URL}/messages"
 APPOINTMENTS_URL = f"{BASE_URL}/appointments"
 
+# Daemon address the docker CLI uses when neither DOCKER_HOST nor a context is set
+DEFAULT_DOCKER_HOST = "npipe:////./pipe/docker_engine" if sys.platform == "win32" else "unix:///var/run/docker.sock"
+
+# One keep-alive session shared by every call in the run
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1)
+))
+
 # Default admin credentials
 DEFAULT_ADMIN_EMAIL = "admin@example.com"
 DEFAULT_ADMIN_PASSWORD = "adminpassword"
 
-# Test data
-TEST_HOSPITAL_EMAIL = f"hospital_{random.randint(1000, 9999)}@example.com"
+# Test data. One random suffix per run keeps the hospital, doctor and patient
+# records of a run easy to match up in the logs
+_SUFFIX = str(random.randint(10**7, 10**8 - 1))
+TEST_HOSPITAL_EMAIL = f"hospital_{_SUFFIX}@example.com"
 TEST_HOSPITAL_PASSWORD = "hospitalpassword"
-TEST_HOSPITAL_NAME = f"Test Hospital {random.randint(1000, 9999)}"
+TEST_HOSPITAL_NAME = f"Test Hospital {_SUFFIX}"
 TEST_HOSPITAL_ADDRESS = "123 Hospital St"
 TEST_HOSPITAL_CITY = "Hospital City"
 TEST_HOSPITAL_STATE = "Hospital State"
@@ -56,16 +94,16 @@ TEST_HOSPITAL_CONTACT = "1234567890"
 TEST_HOSPITAL_PIN_CODE = "123456"
 TEST_HOSPITAL_SPECIALITIES = ["Cardiology", "Neurology"]
 
-TEST_DOCTOR_EMAIL = f"doctor_{random.randint(1000, 9999)}@example.com"
+TEST_DOCTOR_EMAIL = f"doctor_{_SUFFIX}@example.com"
 TEST_DOCTOR_PASSWORD = "doctorpassword"
-TEST_DOCTOR_NAME = f"Dr. Test {random.randint(1000, 9999)}"
+TEST_DOCTOR_NAME = f"Dr. Test {_SUFFIX}"
 TEST_DOCTOR_DESIGNATION = "Senior Doctor"
 TEST_DOCTOR_EXPERIENCE = 10
 TEST_DOCTOR_CONTACT = "9876543210"
 
-TEST_PATIENT_EMAIL = f"patient_{random.randint(1000, 9999)}@example.com"
+TEST_PATIENT_EMAIL = f"patient_{_SUFFIX}@example.com"
 TEST_PATIENT_PASSWORD = "patientpassword"
-TEST_PATIENT_NAME = f"Patient {random.randint(1000, 9999)}"
+TEST_PATIENT_NAME = f"Patient {_SUFFIX}"
 TEST_PATIENT_DOB = "1990-01-01"
 TEST_PATIENT_GENDER = "male"
 TEST_PATIENT_CONTACT = "5555555555"
@@ -86,6 +124,15 @@ case_history_id = None
 chat_id = None
 report_id = None
 
+def parse_body(response) -> Dict:
+    """Decode a JSON response body, falling back to the raw text for empty or non-JSON bodies"""
+    if not response.content:
+        return {"message": response.text}
+    try:
+        return _json_loads(response.content)
+    except ValueError:
+        return {"message": response.text}
+
 def make_request(method: str, url: str, token: Optional[str] = None, data: Optional[Dict] = None,
                  files: Optional[Dict] = None, expected_status: int = 200) -> Tuple[Dict, bool]:
     """
@@ -108,34 +155,27 @@ def make_request(method: str, url: str, token: Optional[str] = None, data: Optio
 
     try:
         if method == "GET":
-            response = requests.get(url, headers=headers)
+            response = SESSION.get(url, headers=headers)
         elif method == "POST":
             if files:
-                response = requests.post(url, headers=headers, data=data, files=files)
+                response = SESSION.post(url, headers=headers, data=data, files=files)
             else:
-                response = requests.post(url, headers=headers, json=data)
+                response = SESSION.post(url, headers=headers, json=data)
         elif method == "PUT":
             if files:
-                response = requests.put(url, headers=headers, data=data, files=files)
+                response = SESSION.put(url, headers=headers, data=data, files=files)
             else:
-                response = requests.put(url, headers=headers, json=data)
+                response = SESSION.put(url, headers=headers, json=data)
         elif method == "DELETE":
-            response = requests.delete(url, headers=headers, json=data)
+            response = SESSION.delete(url, headers=headers, json=data)
         else:
             logger.error(f"Invalid method: {method}")
             return {}, False
 
+        response_data = parse_body(response)
         if response.status_code == expected_status:
-            try:
-                response_data = response.json()
-            except:
-                response_data = {"message": response.text}
             return response_data, True
         else:
-            try:
-                response_data = response.json()
-            except:
-                response_data = {"message": response.text}
             logger.error(f"Request failed: {url}, Status: {response.status_code}, Response: {response_data}")
             return response_data, False
     except Exception as e:
@@ -158,44 +198,103 @@ def login(email: str, password: str) -> Optional[str]:
         "password": password
     }
 
-    # Try to send as JSON first
-    response, success = make_request("POST", f"{AUTH_URL}/login", data=data)
-
-    # If that fails, try form data
-    if not success:
-        logger.info(f"Trying form data login for {email}")
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        try:
-            response = requests.post(
-                f"{AUTH_URL}/login",
-                data=f"username={email}&password={password}",
-                headers=headers
-            )
-
-            if response.status_code == 200:
-                try:
-                    response_data = response.json()
-                    return response_data.get("access_token")
-                except:
-                    logger.error(f"Failed to parse login response: {response.text}")
-                    return None
-        except Exception as e:
-            logger.error(f"Form login exception: {str(e)}")
-            return None
+    # The login endpoint takes OAuth2 form data, so send that first; a JSON retry
+    # only makes sense if the server rejects the form encoding outright
+    try:
+        response = SESSION.post(f"{AUTH_URL}/login", data=data)
+    except Exception as e:
+        logger.error(f"Login exception for {email}: {str(e)}")
+        return None
+
+    if response.status_code in (415, 422):
+        logger.info(f"Form login rejected for {email}, retrying as JSON")
+        response_data, success = make_request("POST", f"{AUTH_URL}/login", data=data)
+    else:
+        response_data = parse_body(response)
+        success = response.status_code == 200
 
     if success:
         logger.info(f"Login successful for {email}")
-        return response.get("access_token")
+        # Responses are wrapped in {status_code, status, message, data}
+        return response_data.get("data", response_data).get("access_token")
     else:
-        logger.error(f"Login failed for {email}")
+        logger.error(f"Login failed for {email}: {response_data}")
         return None
 
+def cache_success(probe):
+    """Run a no-argument probe until it succeeds once, then keep returning True without re-running it"""
+    succeeded = False
+
+    @functools.wraps(probe)
+    def wrapper() -> bool:
+        nonlocal succeeded
+        if not succeeded:
+            succeeded = probe()
+        return succeeded
+    return wrapper
+
+def docker_host() -> str:
+    """Resolve the daemon address like the docker CLI: DOCKER_HOST, then the current context, then the default"""
+    host = os.environ.get("DOCKER_HOST")
+    if host:
+        return host
+
+    config_dir = os.environ.get("DOCKER_CONFIG", os.path.expanduser("~/.docker"))
+    try:
+        context = os.environ.get("DOCKER_CONTEXT")
+        if not context:
+            with open(os.path.join(config_dir, "config.json")) as f:
+                context = json.load(f).get("currentContext")
+        if context and context != "default":
+            # Context metadata is stored under the SHA-256 of the context name
+            meta_dir = hashlib.sha256(context.encode()).hexdigest()
+            with open(os.path.join(config_dir, "contexts", "meta", meta_dir, "meta.json")) as f:
+                return json.load(f)["Endpoints"]["docker"]["Host"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return DEFAULT_DOCKER_HOST
+
+def docker_daemon_reachable(host: str) -> Optional[bool]:
+    """Check whether the daemon at a unix://, tcp:// or npipe:// address accepts connections
+
+    Returns None for other schemes (e.g. ssh://), which only the docker CLI can check.
+    """
+    url = urlsplit(host)
+    try:
+        if url.scheme == "unix":
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.settimeout(0.5)
+                s.connect(url.path)
+        elif url.scheme == "tcp":
+            with socket.create_connection((url.hostname, url.port or 2375), timeout=0.5):
+                pass
+        elif url.scheme == "npipe":
+            with open((url.netloc + url.path).replace("/", "\\"), "rb"):
+                pass
+        else:
+            return None
+    except OSError:
+        return False
+    return True
+
+def docker_cli_running() -> bool:
+    """Ask the docker CLI, which also validates the client setup"""
+    import subprocess
+    result = subprocess.run(["docker", "info"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return result.returncode == 0
+
+@cache_success
 def check_docker_running() -> bool:
     """Check if Docker is running"""
     try:
         logger.info("Checking if Docker is running...")
-        result = subprocess.run(["docker", "info"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if result.returncode == 0:
+        running = None
+        if not os.environ.get("DOCKER_CHECK_CLI"):
+            running = docker_daemon_reachable(docker_host())
+        if running is None:
+            # Diagnostic runs and daemon addresses we cannot dial ourselves go through the CLI
+            running = docker_cli_running()
+        if running:
             logger.info("Docker is running")
             return True
         else:
@@ -205,6 +304,7 @@ def check_docker_running() -> bool:
         logger.error(f"Error checking Docker: {str(e)}")
         return False
 
+@cache_success
 def check_server_health() -> bool:
     """Check if the server is up and running"""
     try:
@@ -229,6 +329,13 @@ def check_server_health() -> bool:
         return False
 
 # Test functions
+def skip(reason):
+    """Mark a test as skipped so main() reports it without calling it"""
+    def wrap(fn):
+        fn._skip_reason = reason
+        return fn
+    return wrap
+
 def test_hospital_signup_login():
     """Test hospital signup and login (Step 1)"""
     global hospital_token, hospital_id, hospital_profile_id
@@ -352,6 +459,7 @@ def test_admin_login():
         admin_token = hospital_token
         return True
 
+@skip("requires admin access")
 def test_admin_maps_hospital_to_doctor():
     """Test admin maps hospital to doctor (Step 5)"""
     global hospital_profile_id, doctor_profile_id
@@ -364,6 +472,7 @@ def test_admin_maps_hospital_to_doctor():
     logger.warning("Skipping hospital-doctor mapping test (requires admin access)")
     return True
 
+@skip("requires admin access")
 def test_admin_maps_hospital_to_patient():
     """Test admin maps hospital to patient (Step 6)"""
     global hospital_profile_id, patient_profile_id
@@ -376,6 +485,7 @@ def test_admin_maps_hospital_to_patient():
     logger.warning("Skipping hospital-patient mapping test (requires admin access)")
     return True
 
+@skip("requires admin access")
 def test_admin_maps_doctor_to_patient():
     """Test admin maps doctor to patient (Step 7)"""
     global doctor_profile_id, patient_profile_id
@@ -388,6 +498,7 @@ def test_admin_maps_doctor_to_patient():
     logger.warning("Skipping doctor-patient mapping test (requires admin access)")
     return True
 
+@skip("requires mappings")
 def test_create_case_history():
     """Test creating a case history (Step 8)"""
     global case_history_id
@@ -400,6 +511,7 @@ def test_create_case_history():
     logger.warning("Skipping case history creation test (requires mappings)")
     return True
 
+@skip("requires mappings")
 def test_create_chat():
     """Test creating a chat (Step 9)"""
     global chat_id
@@ -412,6 +524,7 @@ def test_create_chat():
     logger.warning("Skipping chat creation test (requires mappings)")
     return True
 
+@skip("requires mappings")
 def test_create_report():
     """Test creating a report (Step 10)"""
     global report_id
@@ -424,12 +537,14 @@ def test_create_report():
     logger.warning("Skipping report creation test (requires mappings)")
     return True
 
+@skip("requires chat")
 def test_send_message():
     """Test sending a message (Step 11)"""
     # Skip this test for now as it requires chat to be created
     logger.warning("Skipping message sending test (requires chat)")
     return True
 
+@skip("requires mappings")
 def test_create_appointment():
     """Test creating an appointment (Step 12)"""
     if not patient_token or not doctor_id or not patient_id:
@@ -440,8 +555,32 @@ def test_create_appointment():
     logger.warning("Skipping appointment creation test (requires mappings)")
     return True
 
-def main():
+def run_test(test: Tuple[str, Callable]) -> Tuple[str, object]:
+    """Run one (name, function) test and return (name, outcome), where outcome is True, False or SKIPPED"""
+    test_name, test_func = test
+    # Stubbed-out tests are recorded without being entered
+    if getattr(test_func, "_skip_reason", None):
+        return test_name, "SKIPPED"
+
+    logger.info(f"Running test: {test_name}")
+    try:
+        success = test_func()
+    except Exception as e:
+        logger.error(f"Test '{test_name}' raised an exception: {str(e)}")
+        return test_name, False
+
+    if success:
+        logger.info(f"Test '{test_name}' passed")
+    else:
+        logger.error(f"Test '{test_name}' failed")
+    return test_name, success
+
+def main(output_format: str = "pretty"):
     """Main function to run all tests"""
+    # Keep stdout for the JSON document alone
+    if output_format == "json":
+        _console_handler.setStream(sys.stderr)
+
     # Check if Docker is running
     if not check_docker_running():
         logger.error("Docker is not running. Please start Docker and try again.")
@@ -452,12 +591,17 @@ def main():
         logger.error("Server is not running. Please start the server and try again.")
         return
 
-    # Run all tests
-    tests = [
-        # Step 1-4: Setup
+    # Step 1-3: Setup. The signups are independent and each writes its own
+    # globals, so they run concurrently
+    setup_tests = [
         ("Hospital signup/login", test_hospital_signup_login),
         ("Doctor signup/login", test_doctor_signup_login),
-        ("Patient signup/login", test_patient_signup_login),
+        ("Patient signup/login", test_patient_signup_login)
+    ]
+
+    # Remaining tests depend on the IDs above and run in order
+    tests = [
+        # Step 4: Setup
         ("Admin login", test_admin_login),
 
         # Step 5-7: Admin mappings
@@ -474,38 +618,42 @@ def main():
     ]
 
     # Run each test
-    results = []
-    for test_name, test_func in tests:
-        logger.info(f"Running test: {test_name}")
-        try:
-            success = test_func()
-            results.append((test_name, success))
-            if success:
-                logger.info(f"Test '{test_name}' passed")
-            else:
-                logger.error(f"Test '{test_name}' failed")
-        except Exception as e:
-            logger.error(f"Test '{test_name}' raised an exception: {str(e)}")
-            results.append((test_name, False))
+    with ThreadPoolExecutor(max_workers=len(setup_tests)) as executor:
+        results = list(executor.map(run_test, setup_tests))
+    results.extend(map(run_test, tests))
+
+    statuses = [(test_name, outcome if outcome == "SKIPPED" else ("PASSED" if outcome else "FAILED"))
+                for test_name, outcome in results]
+    counts = {status: sum(1 for _, s in statuses if s == status) for status in ("PASSED", "FAILED", "SKIPPED")}
+
+    if output_format == "json":
+        json.dump({
+            "results": [{"name": test_name, "status": status} for test_name, status in statuses],
+            "passed": counts["PASSED"],
+            "failed": counts["FAILED"],
+            "skipped": counts["SKIPPED"]
+        }, sys.stdout)
+        sys.stdout.write("\n")
+        return
 
     # Print summary
     logger.info("\n--- Test Results Summary ---")
-    passed = 0
-    failed = 0
-    for test_name, success in results:
-        status = "PASSED" if success else "FAILED"
+    for test_name, status in statuses:
         logger.info(f"{test_name}: {status}")
-        if success:
-            passed += 1
-        else:
-            failed += 1
 
-    logger.info(f"\nTotal: {len(results)}, Passed: {passed}, Failed: {failed}")
+    logger.info(f"\nTotal: {len(results)}, Passed: {counts['PASSED']}, Failed: {counts['FAILED']}, Skipped: {counts['SKIPPED']}")
 
-    if failed == 0:
+    if counts["FAILED"] == 0:
         logger.info("All tests passed!")
     else:
-        logger.warning(f"{failed} tests failed.")
+        logger.warning(f"{counts['FAILED']} tests failed.")
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Run the combined API tests")
+    parser.add_argument("--format", choices=["pretty", "json"], default="pretty",
+                        help="Summary format: log lines, or one JSON object on stdout")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
+    main(parse_args().format)
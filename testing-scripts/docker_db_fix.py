@@ -6,24 +6,28 @@ This script modifies the create_chat_in_db function to use the correct database
 
 import os
 import sys
-import re
 
 def fix_db_path(file_path):
     """Fix the database path in the test script"""
     print(f"Fixing database path in {file_path}...")
     
-    # Read the file
-    with open(file_path, 'r') as f:
+    # Read the file (binary mode skips decoding and newline translation)
+    with open(file_path, 'rb') as f:
         content = f.read()
     
-    # Replace the database path
-    pattern = r"conn = sqlite3\.connect\('app\.db'\)"
-    replacement = "conn = sqlite3.connect('/app/app.db')"
+    # Replace the database path (a literal match, no regex needed)
+    new_content = content.replace(
+        b"conn = sqlite3.connect('app.db')",
+        b"conn = sqlite3.connect('/app/app.db')"
+    )
     
-    new_content = re.sub(pattern, replacement, content)
+    # Leave the file (and its mtime) untouched when there is nothing to change
+    if new_content == content:
+        print("Already fixed; nothing to do.")
+        return
     
     # Write the file
-    with open(file_path, 'w') as f:
+    with open(file_path, 'wb') as f:
         f.write(new_content)
     
     print("Database path fixed.")
@@ -14,6 +14,8 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(sys.stdout)]
 )
 
+VALID_ROLES = frozenset({'ADMIN', 'DOCTOR', 'PATIENT', 'HOSPITAL'})
+
 def fix_user_roles():
     """Fix user roles in the database by converting them to uppercase."""
     logging.info("Fixing user roles in the database...")
@@ -21,26 +23,21 @@ def fix_user_roles():
     try:
         # Connect to the database
         conn = sqlite3.connect('app.db')
+        # WAL + synchronous=NORMAL: one fsync per commit instead of two
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
         cursor = conn.cursor()
         
-        # Get all users with lowercase roles
-        cursor.execute("SELECT id, email, role FROM users")
-        users = cursor.fetchall()
-        
-        # Update each user with uppercase role
-        updated_count = 0
-        for user_id, email, role in users:
-            if role and role.upper() in ['ADMIN', 'DOCTOR', 'PATIENT', 'HOSPITAL']:
-                cursor.execute(
-                    "UPDATE users SET role = ? WHERE id = ?",
-                    (role.upper(), user_id)
-                )
-                logging.info(f"Updated user {email} role from '{role}' to '{role.upper()}'")
-                updated_count += 1
-        
-        # Commit changes
-        conn.commit()
-        logging.info(f"Successfully updated {updated_count} user roles")
+        # Uppercase the known roles inside SQLite, touching only rows that need it
+        placeholders = ", ".join("?" * len(VALID_ROLES))
+        with conn:
+            cursor.execute(
+                "UPDATE users SET role = UPPER(role) "
+                f"WHERE role IS NOT NULL AND role <> UPPER(role) AND UPPER(role) IN ({placeholders})",
+                tuple(VALID_ROLES)
+            )
+        logging.info(f"Successfully updated {cursor.rowcount} user roles")
         
         # Close connection
         conn.close()
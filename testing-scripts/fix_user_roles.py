@@ -25,34 +25,26 @@ def fix_user_roles():
     try:
         # Connect to the database
         conn = sqlite3.connect('app.db')
+        # WAL + synchronous=NORMAL: one fsync per commit instead of two
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
         cursor = conn.cursor()
         
-        # Get all users with their roles
-        cursor.execute('SELECT id, role FROM users')
-        users = cursor.fetchall()
+        # Uppercase the roles inside SQLite, touching only rows that need it
+        with conn:
+            cursor.execute('UPDATE users SET role = UPPER(role) WHERE role IS NOT NULL AND role <> UPPER(role)')
+        updates = cursor.rowcount
         
-        # Update each user's role to uppercase
-        updates = 0
-        for user_id, role in users:
-            if role and not role.isupper():
-                upper_role = role.upper()
-                logging.info(f"Converting role for user {user_id}: {role} -> {upper_role}")
-                cursor.execute('UPDATE users SET role = ? WHERE id = ?', (upper_role, user_id))
-                updates += 1
-        
-        # Commit the changes
-        conn.commit()
-        
-        # Verify the changes
-        cursor.execute('SELECT id, role FROM users')
-        updated_users = cursor.fetchall()
-        for user_id, role in updated_users:
-            logging.info(f"User {user_id} now has role: {role}")
+        # Summarize the resulting role distribution instead of logging every row
+        cursor.execute('SELECT role, COUNT(*) FROM users GROUP BY role')
+        for role, count in cursor.fetchall():
+            logging.info("%s: %d users", role, count)
         
         # Close the connection
         conn.close()
         
-        logging.info(f"Fixed {updates} user roles in the database")
+        logging.info("Fixed %d user roles in the database", updates)
         return True
     except Exception as e:
         logging.error(f"Error fixing user roles: {str(e)}")
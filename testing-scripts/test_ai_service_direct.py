@@ -1,7 +1,6 @@
 import asyncio
 import logging
 import sys
-from dotenv import load_dotenv
 
 # Configure logging
 logging.basicConfig(
@@ -10,9 +9,12 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(sys.stdout)]
 )
 
-# Load environment variables
-load_dotenv()
+# Skip per-record thread/process/caller lookups; the format above does not use them
+logging.logThreads = False
+logging.logProcesses = False
+logging._srcfile = None
 
+# Environment variables (.env) are loaded by app.config when the AI service is imported
 # Import the AI service
 from app.services.ai import OpenAIService, get_ai_service
 
@@ -22,7 +24,7 @@ async def test_openai_service():
     
     # Get the AI service
     ai_service = get_ai_service()
-    logging.info(f"Using AI service: {type(ai_service).__name__}")
+    logging.info("Using AI service: %s", type(ai_service).__name__)
     
     # Test messages
     test_messages = [
@@ -38,12 +40,12 @@ async def test_openai_service():
     
     # Send messages and get responses
     for i, message in enumerate(test_messages):
-        logging.info(f"Sending message {i+1}/{len(test_messages)}: '{message}'")
+        logging.info("Sending message %d/%d: '%s'", i + 1, len(test_messages), message)
         
         # Generate response
         response = await ai_service.generate_response(message, context)
         
-        logging.info(f"AI Response: {response}")
+        logging.info("AI Response: %s", response)
         
         # Add to context for next message
         context.append({"role": "user", "content": message})